@@ -7,101 +7,353 @@ specification while maintaining consistent normalized invariants.
 """
 
 import re
-from typing import Dict, List, Any
+import sys
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List
+
+try:
+    # Prefer google-re2 when available: it compiles alternations to a DFA,
+    # runs in time linear in the input and is immune to catastrophic
+    # backtracking on user-supplied spec text
+    import re2 as _re_engine
+except ImportError:
+    _re_engine = re
+
+# Matches runs of characters that are not valid identifier characters so a
+# whole run collapses to one underscore in a single substitution
+_NON_ALNUM_RUN = re.compile(r"[^a-z0-9]+")
+
+# Batch variant: same cleanup, but preserves the \x1f unit separator used to
+# join many names into one string for a single engine pass
+_BATCH_DELIMITER = "\x1f"
+_NON_ALNUM_BATCH_RUN = re.compile(r"[^a-z0-9\x1f]+")
+
+_WHITESPACE_RUN = re.compile(r"\s+")
+
+# Already-normalized variable names: lowercase alphanumeric segments joined
+# by single underscores, with no trailing underscore — exactly the strings
+# the cleanup passes leave untouched. Bound once so the fast path below is a
+# plain function call
+_CANONICAL_NAME_MATCH = re.compile(r"[a-z][a-z0-9]*(?:_[a-z0-9]+)*\Z").match
+
+# Variable name normalization patterns (from the actual Rust code), fused into
+# one alternation so every name/expression is scanned once instead of once per
+# pattern, and compiled exactly once at import
+_NAME_CANONICAL = {
+    "userid": "user_id",
+    "systemstatus": "system_status",
+    "requestcount": "request_count",
+    "responsetime": "response_time",
+    "errorrate": "error_rate",
+    "memoryusage": "memory_usage",
+    "cpuusage": "cpu_usage",
+    "connectioncount": "connection_count",
+}
+_NAME_RE = _re_engine.compile(
+    r"(?i)\b(user\s*id|system\s*status|request\s*count|response\s*time"
+    r"|error\s*rate|memory\s*usage|cpu\s*usage|connection\s*count)\b"
+)
+
+# Operator normalization (from the actual Rust code). Every operator is a
+# single code point, so str.maketrans handles the whole table and
+# str.translate rewrites an expression in one C-level pass with no regex
+_OPERATOR_TRANSLATION = str.maketrans(
+    {
+        "≤": "<=",
+        "≥": ">=",
+        "≠": "!=",
+        "∧": "&&",
+        "∨": "||",
+        "¬": "!",
+        "∀": "forall",
+        "∃": "exists",
+        "∈": "in",
+        "∉": "not_in",
+        "⊆": "subset",
+        "⊂": "proper_subset",
+    }
+)
+
+# Unit standardization (from the actual Rust code). Keys are stored
+# pre-lowered so the case-insensitive fallback is one dict probe, with the
+# conventional uppercase byte abbreviations kept as exact-match aliases so
+# they never pay for lower()
+_UNIT_STANDARDIZATION = {
+    "ms": "milliseconds",
+    "milliseconds": "milliseconds",
+    "s": "seconds",
+    "seconds": "seconds",
+    "min": "minutes",
+    "minutes": "minutes",
+    "b": "bytes",
+    "B": "bytes",
+    "bytes": "bytes",
+    "kb": "kilobytes",
+    "KB": "kilobytes",
+    "kilobytes": "kilobytes",
+    "mb": "megabytes",
+    "MB": "megabytes",
+    "megabytes": "megabytes",
+    "gb": "gigabytes",
+    "GB": "gigabytes",
+    "gigabytes": "gigabytes",
+    "count": "items",
+    "items": "items",
+    "requests": "items",
+    "connections": "items",
+    "%": "ratio",
+    "percent": "ratio",
+    "percentage": "ratio",
+}
+
+# All invariant trigger phrases fused into one alternation so extraction is a
+# single scan of the whole text; the named group that fired selects the kind
+_INVARIANT_RE = _re_engine.compile(
+    r"(?i)(?P<positive>positive|>\s*0)"
+    r"|(?P<password>\b8\b[^\n]*char)"
+    r"|(?P<response>\b500[^\n]*(?:ms|millisecond))"
+    r"|(?P<error>\b1\s*(?:%|percent))"
+)
+
+
+def _canonical_name(match: "re.Match[str]") -> str:
+    """Look up the canonical form for a matched multi-word variable name"""
+    key = _WHITESPACE_RUN.sub("", match.group(1).lower())
+    return _NAME_CANONICAL[key]
+
+
+# Results cache for the generated name normalizer; shared across processors
+# since every table it depends on is a module-level constant
+_NAME_CACHE: Dict[str, str] = {}
+
+# Source for the name normalizer. The pattern set is fixed at import, so the
+# function is generated once with its patterns, tables and cache pre-bound as
+# globals — straight-line bytecode with no attribute lookups in the hot path
+_NORMALIZE_NAME_SRC = '''\
+def _normalize_variable_name(name):
+    """Normalize variable names to consistent format"""
+    cached = _cache_get(name)
+    if cached is not None:
+        return cached
+
+    # Names that are already canonical identifiers — and contain none of
+    # the known multi-word forms like "userid" — pass through untouched:
+    # one match plus one search instead of the full rewrite pipeline
+    if _canonical_match(name) and _name_search(name) is None:
+        result = _intern(name)
+        _cache[name] = result
+        return result
+
+    # Collapse compatibility-equivalent code points (fullwidth letters,
+    # ligatures, ...) before any pattern work, then map known multi-word
+    # names to their canonical form in one pass
+    normalized = _name_sub(_canonical_name, _nfkc("NFKC", name).lower())
+
+    # Collapse each run of spaces/special characters to one underscore,
+    # then trim the edges — a single pass instead of three
+    normalized = _non_alnum_sub("_", normalized).strip("_")
+
+    result = _intern(normalized) if normalized else "unnamed_variable"
+    _cache[name] = result
+    return result
+'''
+
+
+def _build_normalize_variable_name():
+    """Generate the specialized name normalizer for the fixed pattern set"""
+    namespace = {
+        "_cache": _NAME_CACHE,
+        "_cache_get": _NAME_CACHE.get,
+        "_canonical_match": _CANONICAL_NAME_MATCH,
+        "_name_search": _NAME_RE.search,
+        "_name_sub": _NAME_RE.sub,
+        "_non_alnum_sub": _NON_ALNUM_RUN.sub,
+        "_canonical_name": _canonical_name,
+        "_intern": sys.intern,
+        "_nfkc": unicodedata.normalize,
+    }
+    exec(compile(_NORMALIZE_NAME_SRC, "<normalize codegen>", "exec"), namespace)
+    return namespace["_normalize_variable_name"]
+
+
+_normalize_variable_name = _build_normalize_variable_name()
+
+
+@dataclass(slots=True)
+class Invariants:
+    """Extracted invariants in structure-of-arrays layout.
+
+    One parallel list per field, indexed by invariant position: the
+    comparison loops walk contiguous lists instead of chasing per-invariant
+    dicts, and the layout is what a native kernel would consume directly.
+    """
+
+    descriptions: List[str]
+    formal_expressions: List[str]
+    natural_language: List[str]
+    variable_names: List[tuple]
+    variable_types: List[tuple]
+    variable_units: List[list]
+    units: List[Dict[str, str]]
+    confidence_scores: List[float]
+    priorities: List[str]
+
+    def __len__(self) -> int:
+        return len(self.descriptions)
+
+
+@dataclass(slots=True, frozen=True)
+class _InvariantTemplate:
+    """Per-kind constant fields stamped into the arrays on each match"""
+
+    formal_expression: str
+    variable_names: tuple
+    variable_types: tuple
+    variable_units: tuple
+    units: Dict[str, str]
+    confidence_score: float
+    priority: str
+
+
+# One pre-built template per invariant kind; only the description and natural
+# language vary per match, so emission appends the template fields (copying
+# just the two mutable ones) rather than building a fresh nested literal
+_INVARIANT_TEMPLATES = {
+    "positive": _InvariantTemplate(
+        formal_expression="user_id > 0",
+        variable_names=("user_id",),
+        variable_types=("integer",),
+        variable_units=("items",),
+        units={"user_id": "items"},
+        confidence_score=0.9,
+        priority="HIGH",
+    ),
+    "password": _InvariantTemplate(
+        formal_expression="password_length >= 8",
+        variable_names=("password_length",),
+        variable_types=("integer",),
+        variable_units=("items",),
+        units={"password_length": "items"},
+        confidence_score=0.9,
+        priority="CRITICAL",
+    ),
+    "response": _InvariantTemplate(
+        formal_expression="response_time < 500",
+        variable_names=("response_time",),
+        variable_types=("integer",),
+        variable_units=("milliseconds",),
+        units={"response_time": "milliseconds"},
+        confidence_score=0.9,
+        priority="HIGH",
+    ),
+    "error": _InvariantTemplate(
+        formal_expression="error_rate < 0.01",
+        variable_names=("error_rate",),
+        variable_types=("float",),
+        variable_units=("ratio",),
+        units={"error_rate": "ratio"},
+        confidence_score=0.9,
+        priority="HIGH",
+    ),
+}
 
 
 class MockPostProcessor:
     """Mock implementation of the PostProcessor to demonstrate normalization"""
 
+    # Tables and patterns are shared module-level constants compiled once at
+    # import, so instantiating a processor costs no regex compilation
+    unit_standardization = _UNIT_STANDARDIZATION
+
     def __init__(self):
-        # Variable name normalization patterns (from the actual Rust code)
-        self.variable_name_patterns = [
-            (re.compile(r"(?i)user\s*id"), "user_id"),
-            (re.compile(r"(?i)system\s*status"), "system_status"),
-            (re.compile(r"(?i)request\s*count"), "request_count"),
-            (re.compile(r"(?i)response\s*time"), "response_time"),
-            (re.compile(r"(?i)error\s*rate"), "error_rate"),
-            (re.compile(r"(?i)memory\s*usage"), "memory_usage"),
-            (re.compile(r"(?i)cpu\s*usage"), "cpu_usage"),
-            (re.compile(r"(?i)connection\s*count"), "connection_count"),
-        ]
-
-        # Unit standardization (from the actual Rust code)
-        self.unit_standardization = {
-            "ms": "milliseconds",
-            "milliseconds": "milliseconds",
-            "s": "seconds",
-            "seconds": "seconds",
-            "min": "minutes",
-            "minutes": "minutes",
-            "B": "bytes",
-            "bytes": "bytes",
-            "KB": "kilobytes",
-            "kilobytes": "kilobytes",
-            "MB": "megabytes",
-            "megabytes": "megabytes",
-            "GB": "gigabytes",
-            "gigabytes": "gigabytes",
-            "count": "items",
-            "items": "items",
-            "requests": "items",
-            "connections": "items",
-            "%": "ratio",
-            "percent": "ratio",
-            "percentage": "ratio",
-        }
-
-    def normalize_variable_name(self, name: str) -> str:
-        """Normalize variable names to consistent format"""
-        normalized = name.lower()
-
-        # Apply regex patterns
-        for pattern, replacement in self.variable_name_patterns:
-            normalized = pattern.sub(replacement, normalized)
-
-        # Replace spaces and special characters with underscores
-        normalized = re.sub(r"[^a-z0-9]", "_", normalized)
-
-        # Remove consecutive underscores
-        normalized = re.sub(r"_+", "_", normalized)
-
-        # Remove leading/trailing underscores
-        normalized = normalized.strip("_")
-
-        return normalized if normalized else "unnamed_variable"
+        # Memoize normalized results: extraction reuses a small vocabulary of
+        # units and expressions, so repeats become one dict probe (the name
+        # cache lives at module level next to the generated normalizer)
+        self._unit_cache: Dict[str, str] = {}
+        self._expression_cache: Dict[str, str] = {}
+
+    # The pattern set is fixed at import, so the name normalizer is generated
+    # once with every table, pattern method and cache pre-bound as globals of
+    # the generated function (see _build_normalize_variable_name above) —
+    # no attribute lookups or loop overhead remain in the hot path
+    normalize_variable_name = staticmethod(_normalize_variable_name)
+
+    def normalize_variable_names_batch(self, names: List[str]) -> List[str]:
+        """Normalize many variable names in one fused-regex pass.
+
+        Cache misses take the same canonical-name fast path as
+        ``normalize_variable_name``; the rest are joined with the \\x1f unit
+        separator (which never appears in spec variable names), pushed
+        through the same rewrite passes, then split back — paying the regex
+        engine's per-call overhead once per batch instead of once per name.
+        Results match the single-name path exactly.
+        """
+        results = [_NAME_CACHE.get(name) for name in names]
+        misses = []
+        for idx, hit in enumerate(results):
+            if hit is None:
+                name = names[idx]
+                if _CANONICAL_NAME_MATCH(name) and not _NAME_RE.search(name):
+                    result = sys.intern(name)
+                    _NAME_CACHE[name] = result
+                    results[idx] = result
+                else:
+                    misses.append(name)
+        if misses:
+            joined = _BATCH_DELIMITER.join(misses)
+            joined = unicodedata.normalize("NFKC", joined).lower()
+            joined = _NAME_RE.sub(_canonical_name, joined)
+            joined = _NON_ALNUM_BATCH_RUN.sub("_", joined)
+            normalized = iter(joined.split(_BATCH_DELIMITER))
+            for idx, hit in enumerate(results):
+                if hit is None:
+                    trimmed = next(normalized).strip("_")
+                    result = (
+                        sys.intern(trimmed) if trimmed else "unnamed_variable"
+                    )
+                    _NAME_CACHE[names[idx]] = result
+                    results[idx] = result
+        return results
 
     def standardize_unit(self, unit: str) -> str:
         """Standardize units to consistent format"""
-        normalized = unit.lower().strip()
-        return self.unit_standardization.get(normalized, normalized)
+        cached = self._unit_cache.get(unit)
+        if cached is not None:
+            return cached
+
+        # Units coming out of extraction are usually already canonical, so
+        # probe the table directly before paying for lower()/strip()
+        result = self.unit_standardization.get(unit)
+        if result is None:
+            normalized = unit.lower().strip()
+            result = self.unit_standardization.get(normalized, normalized)
+        # Interned so repeated units compare by identity downstream
+        result = sys.intern(result)
+        self._unit_cache[unit] = result
+        return result
 
     def normalize_formal_expression(self, expression: str) -> str:
         """Normalize formal expressions to standard format"""
-        normalized = expression
-
-        # Normalize common mathematical operators
-        replacements = {
-            "≤": "<=",
-            "≥": ">=",
-            "≠": "!=",
-            "∧": "&&",
-            "∨": "||",
-            "¬": "!",
-            "∀": "forall",
-            "∃": "exists",
-            "∈": "in",
-            "∉": "not_in",
-            "⊆": "subset",
-            "⊂": "proper_subset",
-        }
-
-        for old, new in replacements.items():
-            normalized = normalized.replace(old, new)
+        cached = self._expression_cache.get(expression)
+        if cached is not None:
+            return cached
+
+        # Collapse compatibility-equivalent code points first so the
+        # translation table only needs the canonical operator forms, then
+        # normalize common mathematical operators in a single C-level pass
+        normalized = unicodedata.normalize("NFKC", expression).translate(
+            _OPERATOR_TRANSLATION
+        )
 
         # Normalize variable names in expressions
-        for pattern, replacement in self.variable_name_patterns:
-            normalized = pattern.sub(replacement, normalized)
+        normalized = _NAME_RE.sub(_canonical_name, normalized)
 
+        # Interned: expressions come from a small canonical vocabulary, so
+        # cross-case equality checks short-circuit on identity
+        normalized = sys.intern(normalized)
+        self._expression_cache[expression] = normalized
         return normalized
 
 
@@ -111,91 +363,82 @@ class MockInvariantExtractor:
     def __init__(self):
         self.post_processor = MockPostProcessor()
 
-    def extract_invariants_from_text(self, text: str) -> List[Dict[str, Any]]:
+    def extract_invariants_from_text(self, text: str) -> Invariants:
         """Extract invariants from specification text"""
         # This is a simplified mock - in reality, this would use Claude API
-        invariants = []
+        invariants = Invariants([], [], [], [], [], [], [], [], [])
+
+        # One fused-regex pass over the whole text instead of per-line
+        # substring checks; each match is attributed back to its line, and a
+        # line yields at most one invariant (its leftmost match). Duplicate
+        # matches on a line are rejected before any slicing, and a matched
+        # line is never empty, so only the comment/bullet check remains
+        rfind = text.rfind
+        find = text.find
+        last_line_start = -1
+        for match in _INVARIANT_RE.finditer(text):
+            line_start = rfind("\n", 0, match.start()) + 1
+            if line_start == last_line_start:
+                continue
+            last_line_start = line_start
 
-        # Simple pattern matching for demonstration
-        lines = text.split("\n")
-        for line in lines:
-            line = line.strip()
-            if not line or line.startswith("#") or line.startswith("-"):
+            line_end = find("\n", match.end())
+            if line_end == -1:
+                line_end = len(text)
+            line = text[line_start:line_end].strip()
+            if line[0] in "#-":
                 continue
 
-            # Look for common patterns
-            if "positive" in line.lower() or "> 0" in line:
-                invariants.append(
-                    {
-                        "description": line,
-                        "formal_expression": "user_id > 0",
-                        "natural_language": line,
-                        "variables": [
-                            {"name": "user_id", "type": "integer", "unit": "items"}
-                        ],
-                        "units": {"user_id": "items"},
-                        "confidence_score": 0.9,
-                        "priority": "HIGH",
-                    }
-                )
-            elif "8" in line and (
-                "character" in line.lower() or "char" in line.lower()
-            ):
-                invariants.append(
-                    {
-                        "description": line,
-                        "formal_expression": "password_length >= 8",
-                        "natural_language": line,
-                        "variables": [
-                            {
-                                "name": "password_length",
-                                "type": "integer",
-                                "unit": "items",
-                            }
-                        ],
-                        "units": {"password_length": "items"},
-                        "confidence_score": 0.9,
-                        "priority": "CRITICAL",
-                    }
-                )
-            elif "500" in line and (
-                "millisecond" in line.lower() or "ms" in line.lower()
-            ):
-                invariants.append(
-                    {
-                        "description": line,
-                        "formal_expression": "response_time < 500",
-                        "natural_language": line,
-                        "variables": [
-                            {
-                                "name": "response_time",
-                                "type": "integer",
-                                "unit": "milliseconds",
-                            }
-                        ],
-                        "units": {"response_time": "milliseconds"},
-                        "confidence_score": 0.9,
-                        "priority": "HIGH",
-                    }
-                )
-            elif "1%" in line or "1 percent" in line.lower():
-                invariants.append(
-                    {
-                        "description": line,
-                        "formal_expression": "error_rate < 0.01",
-                        "natural_language": line,
-                        "variables": [
-                            {"name": "error_rate", "type": "float", "unit": "ratio"}
-                        ],
-                        "units": {"error_rate": "ratio"},
-                        "confidence_score": 0.9,
-                        "priority": "HIGH",
-                    }
-                )
+            template = _INVARIANT_TEMPLATES[match.lastgroup]
+            invariants.descriptions.append(line)
+            invariants.natural_language.append(line)
+            invariants.formal_expressions.append(template.formal_expression)
+            invariants.variable_names.append(template.variable_names)
+            invariants.variable_types.append(template.variable_types)
+            invariants.variable_units.append(list(template.variable_units))
+            invariants.units.append(dict(template.units))
+            invariants.confidence_scores.append(template.confidence_score)
+            invariants.priorities.append(template.priority)
 
         return invariants
 
 
+# Shared pipeline instance: every table and pattern above is compiled at
+# import, so one extractor amortizes all setup across documents
+_PIPELINE = MockInvariantExtractor()
+
+
+@lru_cache(maxsize=256)
+def process(text: str) -> Invariants:
+    """Extract invariants from ``text`` through the shared pipeline.
+
+    Identical inputs (reused spec headers, retried documents) come straight
+    from the cache. The cached invariants are shared between callers, so
+    treat them as read-only; callers that normalize in place should use
+    ``_PIPELINE.extract_invariants_from_text`` directly.
+    """
+    return _PIPELINE.extract_invariants_from_text(text)
+
+
+def _encode_invariants(
+    invariants: Invariants, interner: Dict[str, int]
+) -> List[tuple]:
+    """Pack invariants as (variable-id tuple, expression id) pairs.
+
+    Interning names and expressions to small ints up front means the
+    cross-case comparison sweep is integer equality on compact tuples rather
+    than repeated string comparisons.
+    """
+    encoded = []
+    for names, expression in zip(
+        invariants.variable_names, invariants.formal_expressions
+    ):
+        var_ids = tuple(interner.setdefault(n, len(interner)) for n in names)
+        expr_id = interner.setdefault(expression, len(interner))
+        encoded.append((var_ids, expr_id))
+    return encoded
+
+
 def demonstrate_language_variations():
     """Demonstrate how the system handles different phrasings"""
 
@@ -282,104 +525,133 @@ def demonstrate_language_variations():
         ),
     ]
 
-    extractor = MockInvariantExtractor()
+    extractor = _PIPELINE
 
     # Store results for comparison
     all_results = {}
 
-    # Test each case
+    # Test each case. Output is accumulated per case and flushed with a
+    # single write so I/O does not dominate the normalization being measured
     for case_id, title, content in test_cases:
-        print(f"\n{'='*60}")
-        print(f"TESTING CASE: {case_id}")
-        print(f"{'='*60}")
-        print(f"Title: {title}")
-        print(f"Content:\n{content}")
+        out = []
+        out.append(f"\n{'='*60}")
+        out.append(f"TESTING CASE: {case_id}")
+        out.append(f"{'='*60}")
+        out.append(f"Title: {title}")
+        out.append(f"Content:\n{content}")
 
         # Extract invariants
         invariants = extractor.extract_invariants_from_text(content)
 
-        print(f"\nExtracted {len(invariants)} invariants:")
-
-        # Process and normalize invariants
-        normalized_invariants = []
-        for inv in invariants:
-            # Normalize variable names
-            for var in inv["variables"]:
-                var["name"] = extractor.post_processor.normalize_variable_name(
-                    var["name"]
+        out.append(f"\nExtracted {len(invariants)} invariants:")
+
+        # Process and normalize invariants, field array by field array.
+        # Variable names are batch-normalized across the whole case in one
+        # fused-regex pass, then sliced back per invariant
+        post_processor = extractor.post_processor
+        flat_names = [n for names in invariants.variable_names for n in names]
+        flat_normalized = post_processor.normalize_variable_names_batch(flat_names)
+        cursor = 0
+        for i in range(len(invariants)):
+            # Remember old -> new so the units pass below reuses the result
+            # instead of re-normalizing
+            original_names = invariants.variable_names[i]
+            count = len(original_names)
+            new_names = flat_normalized[cursor : cursor + count]
+            cursor += count
+            name_map = dict(zip(original_names, new_names))
+            invariants.variable_names[i] = tuple(new_names)
+
+            variable_units = invariants.variable_units[i]
+            for j in range(count):
+                variable_units[j] = post_processor.standardize_unit(
+                    variable_units[j]
                 )
-                var["unit"] = extractor.post_processor.standardize_unit(var["unit"])
 
-            # Normalize units
-            normalized_units = {}
-            for var_name, unit in inv["units"].items():
-                normalized_var_name = extractor.post_processor.normalize_variable_name(
-                    var_name
-                )
-                normalized_units[normalized_var_name] = (
-                    extractor.post_processor.standardize_unit(unit)
-                )
-            inv["units"] = normalized_units
+            # Normalize units, keyed by the already-normalized names; only
+            # keys with no matching variable fall back to normalization
+            invariants.units[i] = {
+                (
+                    name_map[var_name]
+                    if var_name in name_map
+                    else post_processor.normalize_variable_name(var_name)
+                ): post_processor.standardize_unit(unit)
+                for var_name, unit in invariants.units[i].items()
+            }
 
             # Normalize formal expression
-            inv["formal_expression"] = (
-                extractor.post_processor.normalize_formal_expression(
-                    inv["formal_expression"]
+            invariants.formal_expressions[i] = (
+                post_processor.normalize_formal_expression(
+                    invariants.formal_expressions[i]
                 )
             )
 
-            normalized_invariants.append(inv)
-
-            print(f"  - {inv['description']}")
-            print(f"    Formal: {inv['formal_expression']}")
-            print(f"    Variables: {[v['name'] for v in inv['variables']]}")
-            print(f"    Units: {inv['units']}")
+            out.append(f"  - {invariants.descriptions[i]}")
+            out.append(f"    Formal: {invariants.formal_expressions[i]}")
+            out.append(f"    Variables: {list(invariants.variable_names[i])}")
+            out.append(f"    Units: {invariants.units[i]}")
 
-        all_results[case_id] = normalized_invariants
+        sys.stdout.write("\n".join(out) + "\n")
+        all_results[case_id] = invariants
 
     # Compare results across cases
     print(f"\n{'='*80}")
     print("CROSS-CASE COMPARISON")
     print(f"{'='*80}")
 
-    # Check consistency
+    # Check consistency. Names and expressions are interned to small ints
+    # once, so the sweep below compares compact id tuples instead of walking
+    # the nested variable dicts for every pair
+    interner: Dict[str, int] = {}
+    encoded = {
+        case_id: _encode_invariants(invariants, interner)
+        for case_id, invariants in all_results.items()
+    }
+
     base_case = all_results["direct-statement"]
+    base_encoded = encoded["direct-statement"]
     print(f"Base case ('direct-statement') has {len(base_case)} invariants")
 
     for case_id, invariants in all_results.items():
         if case_id == "direct-statement":
             continue
 
-        print(f"\nComparing '{case_id}' with base case:")
+        out = [f"\nComparing '{case_id}' with base case:"]
 
         if len(invariants) == len(base_case):
-            print(f"  ✓ Same number of invariants ({len(invariants)})")
+            out.append(f"  ✓ Same number of invariants ({len(invariants)})")
 
             # Check variable name consistency
-            for i, (base_inv, case_inv) in enumerate(zip(base_case, invariants)):
-                base_vars = [v["name"] for v in base_inv["variables"]]
-                case_vars = [v["name"] for v in case_inv["variables"]]
-
-                if base_vars == case_vars:
-                    print(f"  ✓ Invariant {i+1}: Variable names match: " f"{base_vars}")
+            case_encoded = encoded[case_id]
+            for i in range(len(base_case)):
+                (base_var_ids, base_expr_id) = base_encoded[i]
+                (case_var_ids, case_expr_id) = case_encoded[i]
+
+                if base_var_ids == case_var_ids:
+                    base_vars = list(base_case.variable_names[i])
+                    out.append(
+                        f"  ✓ Invariant {i+1}: Variable names match: " f"{base_vars}"
+                    )
                 else:
-                    print(f"  ✗ Invariant {i+1}: Variable names differ")
-                    print(f"    Base: {base_vars}")
-                    print(f"    Case: {case_vars}")
+                    out.append(f"  ✗ Invariant {i+1}: Variable names differ")
+                    out.append(f"    Base: {list(base_case.variable_names[i])}")
+                    out.append(f"    Case: {list(invariants.variable_names[i])}")
 
                 # Check formal expressions
-                if base_inv["formal_expression"] == case_inv["formal_expression"]:
-                    print(f"  ✓ Invariant {i+1}: Formal expressions match")
+                if base_expr_id == case_expr_id:
+                    out.append(f"  ✓ Invariant {i+1}: Formal expressions match")
                 else:
-                    print(f"  ✗ Invariant {i+1}: Formal expressions differ")
-                    print(f"    Base: {base_inv['formal_expression']}")
-                    print(f"    Case: {case_inv['formal_expression']}")
+                    out.append(f"  ✗ Invariant {i+1}: Formal expressions differ")
+                    out.append(f"    Base: {base_case.formal_expressions[i]}")
+                    out.append(f"    Case: {invariants.formal_expressions[i]}")
         else:
-            print(
+            out.append(
                 f"  ✗ Different number of invariants: "
                 f"{len(invariants)} vs {len(base_case)}"
             )
 
+        sys.stdout.write("\n".join(out) + "\n")
+
     print(f"\n{'='*80}")
     print("KEY INSIGHTS")
     print(f"{'='*80}")